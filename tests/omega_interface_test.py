@@ -27,16 +27,100 @@ def test_grspec_to_automaton():
     assert set(a.vars.keys()) == set(v), a
     assert a.varlist['env'] == ['x']
     assert a.varlist['sys'] == ['y']
-    r = a._fetch_expr(a.action['env'])
-    assert r == "TRUE", r
-    r = a._fetch_expr(a.action['sys'])
-    assert r == '( ( ( X x ) -> ( X y ) ) )', r
+    assert a.action['env'] == a.true, a.action['env']
+    u = a.add_expr("x' -> y'")
+    assert a.action['sys'] == u, a.action['sys']
+    r = a.win['<>[]']
+    assert r == [a.add_expr('x')], r
+    r = a.win['[]<>']
+    assert r == [a.add_expr('! y')], r
 #    r = a.win['<>[]']
 #    assert r == '!(( ! x ))', r
 #    r = a.win['[]<>']
 #    assert r == ['( ! y )'], r
 
 
+def test_grspec_to_automaton_cache():
+    omega_int.clear_cache()
+    sp = grspec_1()
+    a = omega_int._grspec_to_automaton(sp)
+    b = omega_int._grspec_to_automaton(sp)
+    assert a is not b
+    assert a.bdd is b.bdd
+    assert a.action['sys'] == b.action['sys']
+    assert a.win == b.win, (a.win, b.win)
+    # equal specs share the cached automaton
+    e = omega_int._grspec_to_automaton(grspec_1())
+    assert e.bdd is a.bdd
+    # modifying a copy leaves the cached automaton unchanged
+    b.action['sys'] = b.false
+    c = omega_int._grspec_to_automaton(sp)
+    assert c.action['sys'] == a.action['sys']
+    # changing the spec invalidates the cache
+    sp.sys_safety = ["y' = 0"]
+    d = omega_int._grspec_to_automaton(sp)
+    assert d.bdd is not a.bdd
+    assert d.action['sys'] == d.add_expr("y' = 0")
+    h = omega_int.synthesize_enumerated_streett(sp)
+    assert h is not None
+    h = omega_int.synthesize_enumerated_streett(sp)
+    assert h is not None
+
+
+def test_solve_streett_game_cache():
+    omega_int.clear_cache()
+    sp = grspec_1()
+    a, z, yij, xijk = omega_int._solve_streett_game(sp)
+    # the winning set is cached, so the game is not solved again
+    solve = omega_int.gr1.solve_streett_game
+    def fail(aut):
+        raise AssertionError('game solved again')
+    omega_int.gr1.solve_streett_game = fail
+    try:
+        b, z_ = omega_int._winning_set(sp)
+        r = omega_int.is_realizable(sp)
+    finally:
+        omega_int.gr1.solve_streett_game = solve
+    assert a is not b
+    assert a.bdd is b.bdd
+    assert z == z_, (z, z_)
+    assert b.varlist["sys'"] == ["y'"], b.varlist
+    assert r, r
+
+
+def test_int_bounds():
+    sp = grspec_1()
+    a = omega_int._grspec_to_automaton(sp)
+    u = omega_int._int_bounds(a)
+    v = a.add_expr(
+        "(0 <= x) & (x <= 3) & (0 <= x') & (x' <= 3) & "
+        "(0 <= y) & (y <= 3) & (0 <= y') & (y' <= 3)")
+    assert u == v, (u, v)
+    a = omega_int._grspec_to_automaton(grspec_0())
+    u = omega_int._int_bounds(a)
+    assert u == a.true, u
+
+
+def test_strategy_to_state_annotated():
+    a = omega_int._grspec_to_automaton(grspec_0())
+    g = nx.DiGraph()
+    g.add_node(0, x=True, y=False, _goal=0)
+    g.add_node(1, x=False, y=True, _goal=0)
+    g.add_node(2, x=False, _goal=0, z=1)
+    g.add_node(3, x=True, y=True, **{"x'": False})
+    g.add_edges_from([(0, 1), (1, 2), (2, 3)])
+    g.initial_nodes = {0}
+    h = omega_int._strategy_to_state_annotated(g, a)
+    assert h is g
+    states = dict(h.nodes(data='state'))
+    assert states[0] == dict(x=True, y=False), states
+    assert states[1] == dict(x=False, y=True), states
+    assert states[2] == dict(x=False), states
+    assert states[3] == {'x': True, 'y': True, "x'": False}, states
+    assert set(h.edges()) == {(0, 1), (1, 2), (2, 3)}
+    assert h.initial_nodes == {0}
+
+
 def test_synthesis_bool():
     sp = grspec_0()
     h = omega_int.synthesize_enumerated_streett(sp)
@@ -134,6 +218,39 @@ def test_synthesis_unrealizable():
     assert h is None, h
 
 
+def test_synthesis_sys_cannot_move():
+    sp = grspec_1()
+    sp.sys_safety = ['False']
+    r = omega_int.is_realizable(sp)
+    assert not r, r
+    h = omega_int.synthesize_enumerated_streett(sp)
+    assert h is None, h
+    # vacuously realizable
+    sp.env_init = ['False']
+    r = omega_int.is_realizable(sp)
+    assert r, r
+
+
+def test_synthesize_batch():
+    sp = grspec_1()
+    sp.env_prog = ['x = 0', 'x = 1']
+    sp.sys_prog = ['y = 0', 'y = 1']
+    specs = [grspec_1(), grspec_2(), grspec_3(), sp]
+    hs = omega_int.synthesize_batch(specs)
+    assert len(hs) == len(specs), hs
+    assert hs[2] is None, hs[2]
+    for spec, h in zip(specs, hs):
+        h_ = omega_int.synthesize_enumerated_streett(spec)
+        if h_ is None:
+            assert h is None, h
+            continue
+        assert len(h) == len(h_), (len(h), len(h_))
+        assert h.number_of_edges() == h_.number_of_edges()
+    # a variable with different types
+    with nt.assert_raises(ValueError):
+        omega_int.synthesize_batch([grspec_0(), grspec_1()])
+
+
 def test_is_circular_true():
     f = form.GRSpec()
     f.sys_vars['y'] = 'bool'
@@ -41,3 +41,30 @@ def rabin_test():
     assert(dra.states.accepting._pairs[1][0]._list == [] )
     assert(dra.states.accepting._pairs[1][1]._set == set() )
     assert(dra.states.accepting._pairs[1][1]._list == [] )
+
+    assert(dra.states.accepting.accepts([1]))
+    assert(dra.states.accepting.accepts([2, 3]))
+    assert(dra.states.accepting.accepts(iter([2, 4])))
+    assert(not dra.states.accepting.accepts([3, 4]))
+    assert(not dra.states.accepting.accepts([]))
+
+    good, bad = dra.states.accepting[1]
+    dra.states.accepting.remove(good, bad)
+    assert(len(dra.states.accepting._pairs) == 1)
+    dra.states.accepting.remove_at(0)
+    assert(not dra.states.accepting._pairs)
+
+
+def tuple2ba_test():
+    ba = trs.tuple2ba(
+        {0, 1, 2}, 0, [2], {'p', 'q'},
+        [(0, 1, 'p'), (1, 2, None), (2, 0, {'p', 'q'})],
+        prepend_str='s')
+    assert(set(ba.states) == {'s0', 's1', 's2'})
+    assert(set(ba.states.initial) == {'s0'})
+    assert(set(ba.states.accepting) == {'s2'})
+    trans = {(u, v, d['letter'])
+             for u, v, d in ba.transitions(data=True)}
+    assert(trans == {('s0', 's1', frozenset({'p'})),
+                     ('s1', 's2', frozenset()),
+                     ('s2', 's0', frozenset({'p', 'q'}))})
@@ -5,6 +5,7 @@ logger = logging.getLogger(__name__)
 logging.getLogger('tulip.transys.products').setLevel(logging.DEBUG)
 from tulip import transys as trs
 from tulip.transys.mathset import MathSet, PowerSet
+from nose import tools as nt
 
 
 def ts_test():
@@ -89,6 +90,29 @@ def ba_ts_prod_test():
     return ba_ts
 
 
+def ba_ts_sync_prod_test():
+    ts = ts_test()
+    ba = trs.BA()
+    ba.atomic_propositions |= {'p'}
+    ba.states.add_from({'q0', 'q1'})
+    ba.states.initial.add('q0')
+    ba.states.accepting.add('q1')
+    ba.transitions.add('q0', 'q1', letter={'p'})
+    ba.transitions.add('q1', 'q1', letter={'p'})
+    ba.transitions.add('q1', 'q0', letter=set())
+    ba.transitions.add('q0', 'q0', letter=set())
+    ba_ts = trs.products.ba_ts_sync_prod(ba, ts)
+    check_prodba(ba_ts)
+    assert(set(ba_ts.states.accepting) == {('s0', 'q1')})
+    # TS labels outside the BA alphabet
+    ts.atomic_propositions.add('r')
+    ts.states['s2']['ap'] = {'r'}
+    ba.atomic_propositions.add(True)
+    ba.transitions.add('q0', 'q0', letter={True})
+    with nt.assert_raises(ValueError):
+        trs.products.ba_ts_sync_prod(ba, ts)
+
+
 def check_prodba(ba_ts):
     states = {('s0', 'q1'), ('s1', 'q0'),
               ('s2', 'q0'), ('s3', 'q0')}
@@ -116,6 +140,63 @@ def check_prodba(ba_ts):
         )[0][2]['letter'] == {'p'}
     )
 
+
+def index_ba_transitions_test():
+    ba = trs.BA()
+    ba.atomic_propositions |= {'p', True}
+    ba.states.add_from({'q0', 'q1'})
+    ba.transitions.add('q0', 'q1', letter={'p'})
+    ba.transitions.add('q0', 'q0', letter=set())
+    ba.transitions.add('q1', 'q0', letter={True})
+    ba_post = trs.products._index_ba_transitions(ba)
+    assert(set(ba_post) == {'q0', 'q1'})
+    assert(set(ba_post['q0']) == {frozenset({'p'}), frozenset()})
+    assert(ba_post['q0'][frozenset({'p'})] == [('q0', 'q1', {'letter': {'p'}})])
+    q1_post = trs.products._index_ba_transitions(ba, ['q1'])
+    assert(set(q1_post) == {'q1'})
+    ts = trs.FTS()
+    ts.atomic_propositions.add('p')
+    ts.states.add_from({'s0', 's1'})
+    ts.states['s0']['ap'] = {'p'}
+    ts.states['s1']['ap'] = set()
+    succ = trs.products.find_ba_succ('q0', 's0', ts, ba, ba_post)
+    assert(succ == [('q0', 'q1', {'letter': {'p'}})])
+    succ = trs.products.find_ba_succ('q1', 's1', ts, ba)
+    assert(succ == [('q1', 'q0', {'letter': {True}})])
+
+
+def ts_ba_sync_prod_actions_test():
+    ts = trs.FTS()
+    ts.states.add_from({'s0', 's1'})
+    ts.states.initial.add('s0')
+    ts.atomic_propositions.add('p')
+    ts.states['s0']['ap'] = {'p'}
+    ts.sys_actions.add_from({'go', 'stay'})
+    ts.transitions.add('s0', 's1', sys_actions='go')
+    ts.transitions.add('s0', 's1', sys_actions='stay')
+    ts.transitions.add('s1', 's0')
+    ba = trs.BA()
+    ba.atomic_propositions |= {'p', True}
+    ba.states.add('q0')
+    ba.states.initial.add('q0')
+    ba.states.accepting.add('q0')
+    ba.transitions.add('q0', 'q0', letter={True})
+    (ts_ba, persistent) = trs.products.ts_ba_sync_prod(ts, ba)
+    states = {('s0', 'q0'), ('s1', 'q0')}
+    assert(set(ts_ba.states) == states)
+    assert(set(ts_ba.states.initial) == {('s0', 'q0')})
+    assert(persistent == states)
+    assert(ts_ba.states[('s1', 'q0')]['ap'] == {'q0'})
+    assert(ts_ba.states[('s1', 'q0')]['ap'] is
+           ts_ba.states[('s0', 'q0')]['ap'])
+    assert(set(ts_ba.sys_actions) == {'go', 'stay'})
+    trans = ts_ba.transitions.find([('s0', 'q0')], [('s1', 'q0')])
+    actions = {d['sys_actions'] for _, _, d in trans}
+    assert(actions == {'go', 'stay'})
+    trans = ts_ba.transitions.find([('s1', 'q0')], [('s0', 'q0')])
+    assert(trans == [(('s1', 'q0'), ('s0', 'q0'), {})])
+
+
 def on_the_fly_test():
     ba = ba_test()
     ts = ts_test()
@@ -13,6 +13,9 @@ U{https://pypi.python.org/pypi/omega}
 from __future__ import absolute_import
 from __future__ import print_function
 
+import atexit
+import collections
+import copy
 import logging
 import time
 
@@ -24,52 +27,110 @@ try:
     from omega.games import enumeration as enum
 except ImportError:
     omega = None
-import networkx as nx
 
 
 log = logging.getLogger(__name__)
+# signature of `GRSpec` -> [`omega.symbolic.temporal.Automaton`,
+#     winning set of Streett game, or `None` if not solved yet]
+# ordered from least to most recently used
+_automata = collections.OrderedDict()
+_MAX_CACHED = 64
+_INT_TYPES = frozenset({'int', 'saturating', 'modwrap'})
 
 
 def is_realizable(spec):
     """Return `True` if, and only if, realizable.
 
+    The winning set is cached, so repeated calls for an
+    unchanged specification skip solving the game.
+    Call `clear_cache` to free the cached results.
+
     See `synthesize_enumerated_streett` for more details.
     """
-    aut = _grspec_to_automaton(spec)
-    t0 = time.time()
-    z, _, _ = gr1.solve_streett_game(aut)
-    t1 = time.time()
+    aut, z = _winning_set(spec)
     return gr1.is_realizable(z, aut)
 
 
 def synthesize_enumerated_streett(spec):
     """Return transducer enumerated as a graph.
 
+    The automaton of `spec` is cached and reused, but
+    the game is solved again on every call. Call
+    `clear_cache` to free the cached automaton.
+
     @type spec: `tulip.spec.form.GRSpec`
     @rtype: `networkx.DiGraph`
     """
-    aut = _grspec_to_automaton(spec)
-    assert aut.action['sys'] != aut.false
-    t0 = time.time()
-    z, yij, xijk = gr1.solve_streett_game(aut)
-    t1 = time.time()
+    return _synthesize(lambda: _solve_streett_game(spec))
+
+
+def synthesize_batch(specs):
+    """Return transducers for `specs`, enumerated as graphs.
+
+    Same as calling `synthesize_enumerated_streett` for
+    each specification, except that all automata share
+    one BDD manager, so BDD operations common to `specs`
+    are computed once. Variables with the same name must
+    have the same type in all of `specs`.
+
+    @type specs: iterable of `tulip.spec.form.GRSpec`
+    @return: `list` with a `networkx.DiGraph`, or `None`
+        if unrealizable, for each specification
+    """
+    if omega is None:
+        raise ImportError(
+            'Failed to import package `omega`.')
+    specs = list(specs)
+    types = dict()
+    for spec in specs:
+        for var, r in _var_types(spec).items():
+            if types.setdefault(var, r) != r:
+                raise ValueError((
+                    'variable "{var}" has type {r} in one '
+                    'specification, but {s} in another').format(
+                        var=var, r=r, s=types[var]))
+    base = trl.Automaton()
+    if types:
+        base.declare_variables(**types)
+    results = list()
+    for spec in specs:
+        aut = copy.copy(base)
+        _load_formulas(aut, spec)
+        h = _synthesize(lambda: (aut,) + _solve(aut))
+        results.append(h)
+    return results
+
+
+def _synthesize(solve):
+    """Return transducer enumerated as a graph.
+
+    @param solve: callable that returns `(aut, z, yij, xijk)`,
+        see `_solve_streett_game`
+    @rtype: `networkx.DiGraph`
+    """
+    # measure time only if it will be logged
+    timed = log.isEnabledFor(logging.INFO)
+    t0 = time.time() if timed else None
+    aut, z, yij, xijk = solve()
+    t1 = time.time() if timed else None
     # unrealizable ?
     if not gr1.is_realizable(z, aut):
         print('WARNING: unrealizable')
         return None
+    assert aut.action['sys'] != aut.false
     gr1.make_streett_transducer(z, yij, xijk, aut)
-    t2 = time.time()
+    # enumeration needs only `aut.action['impl']`
+    del z, yij, xijk
+    t2 = time.time() if timed else None
     g = enum.action_to_steps(aut, 'env', 'impl', qinit=aut.qinit)
     h = _strategy_to_state_annotated(g, aut)
-    del z, yij, xijk
-    t3 = time.time()
-    log.info((
-        'Winning set computed in {win} sec.\n'
-        'Symbolic strategy computed in {sym} sec.\n'
-        'Strategy enumerated in {enu} sec.').format(
-            win=t1 - t0,
-            sym=t2 - t1,
-            enu=t3 - t2))
+    if timed:
+        t3 = time.time()
+        log.info(
+            'Winning set computed in %s sec.\n'
+            'Symbolic strategy computed in %s sec.\n'
+            'Strategy enumerated in %s sec.',
+            t1 - t0, t2 - t1, t3 - t2)
     return h
 
 
@@ -84,6 +145,21 @@ def is_circular(spec):
     return triv != t.bdd.false
 
 
+def _sys_cannot_move(aut):
+    """Return `True` if the winning set is known to be empty.
+
+    This is the case when the environment can always move,
+    but the system never can. The Streett game need not be
+    solved then, only the initial conditions checked.
+
+    @type aut: `omega.symbolic.temporal.Automaton`
+    @rtype: `bool`
+    """
+    return (
+        aut.action['sys'] == aut.false and
+        aut.action['env'] == aut.true)
+
+
 def _int_bounds(aut):
     """Create care set for enumeration.
 
@@ -91,83 +167,295 @@ def _int_bounds(aut):
     @return: node in a `dd.bdd.BDD`
     @rtype: `int`
     """
-    int_types = {'int', 'saturating', 'modwrap'}
-    bdd = aut.bdd
-    u = bdd.true
+    bounds = [
+        aut.add_expr("({p} <= {var}) & ({var} <= {q})".format(
+            p=p, q=q, var=var))
+        for var, (p, q) in _int_vars(aut)]
+    if not bounds:
+        return aut.bdd.true
+    return _balanced_and(aut.bdd, bounds)
+
+
+def _int_vars(aut):
+    """Return integer variables of `aut`, with their domains.
+
+    @type aut: `omega.symbolic.temporal.Automaton`
+    @rtype: `list` of `(str, (int, int))`
+    """
+    r = list()
     for var, d in aut.vars.items():
         t = d['type']
         if t == 'bool':
             continue
-        assert t in int_types, t
-        dom = d['dom']
-        p, q = dom
-        e = "({p} <= {var}) & ({var} <= {q})".format(
-            p=p, q=q, var=var)
-        v = aut.add_expr(e)
-        u = bdd.apply('and', u, v)
-    return u
+        assert t in _INT_TYPES, t
+        r.append((var, d['dom']))
+    return r
 
 
 def _strategy_to_state_annotated(g, aut):
     """Move annotation to `dict` as value of `'state'` key.
 
+    The node annotations of `g` are replaced in place,
+    instead of copying the enumerated strategy.
+
     @type g: `nx.DiGraph`
     @type: aut: `omega.symbolic.symbolic.Automaton`
+    @return: `g`
     @rtype: `nx.DiGraph`
     """
-    h = nx.DiGraph()
-    for u, d in g.nodes(data=True):
-        dvars = {k: d[k] for k in d if k in aut.vars}
-        h.add_node(u, state=dvars)
-    for u, v in g.edges():
-        h.add_edge(u, v)
-    h.initial_nodes = set(g.initial_nodes)
-    return h
+    vrs = set(aut.vars)
+    # Enumeration annotates all nodes with the same keys,
+    # so intersect with `vrs` once, and recompute only
+    # for a node annotated differently.
+    node_keys = frozenset()
+    keys = None
+    for _, d in g.nodes(data=True):
+        # not `d.keys() != node_keys`, because in Python 2
+        # `dict.keys` returns a `list`, which never equals a set
+        if (keys is None or len(d) != len(node_keys) or
+                not node_keys.issuperset(d)):
+            node_keys = frozenset(d)
+            keys = tuple(vrs.intersection(d))
+        state = {k: d[k] for k in keys}
+        d.clear()
+        d['state'] = state
+    return g
+
+
+def clear_cache():
+    """Forget the cached automata and game solutions."""
+    _automata.clear()
+
+
+# release cached BDD nodes before their managers are deleted
+atexit.register(clear_cache)
 
 
 def _grspec_to_automaton(g):
     """Return `omega.symbolic.temporal.Automaton` from `GRSpec`.
 
+    The automaton is cached by the variables, formulas,
+    and semantics of `g`, so it is rebuilt only if these change.
+    Each call returns a fresh copy of the cached automaton
+    (sharing the BDD manager), so callers can modify
+    `init`, `action`, `win`, and `varlist` freely.
+
     @type g: `tulip.spec.form.GRSpec`
     @rtype: `omega.symbolic.temporal.Automaton`
     """
+    a, _ = _cache_entry(g)
+    return _copy_automaton(a)
+
+
+def _winning_set(g):
+    """Return automaton from `g`, and winning set of its Streett game.
+
+    The winning set is cached together with the automaton,
+    see `_grspec_to_automaton`.
+
+    @type g: `tulip.spec.form.GRSpec`
+    @return: `(aut, z)`, where `aut` is a fresh copy
+    """
+    entry = _cache_entry(g)
+    if entry[1] is None:
+        return _solve_streett_game(g)[:2]
+    aut = _copy_automaton(entry[0])
+    # as `gr1.solve_streett_game` would
+    aut.build()
+    return aut, entry[1]
+
+
+def _solve_streett_game(g):
+    """Return automaton from `g`, and solution of its Streett game.
+
+    Only the winning set `z` is cached, see `_winning_set`.
+    The iterants `yij`, `xijk` are large, so they are
+    recomputed by each call, and freed by the caller.
+
+    @type g: `tulip.spec.form.GRSpec`
+    @return: `(aut, z, yij, xijk)`, where `aut` is a fresh copy,
+        and the rest as returned by `omega.games.gr1.solve_streett_game`
+    """
+    entry = _cache_entry(g)
+    aut = _copy_automaton(entry[0])
+    z, yij, xijk = _solve(aut)
+    entry[1] = z
+    return aut, z, yij, xijk
+
+
+def _solve(aut):
+    """Return `(z, yij, xijk)` for the Streett game of `aut`.
+
+    Same as `omega.games.gr1.solve_streett_game`, but the
+    fixpoint is skipped if `_sys_cannot_move(aut)`.
+
+    @type aut: `omega.symbolic.temporal.Automaton`
+    @rtype: `tuple`
+    """
+    if _sys_cannot_move(aut):
+        aut.build()
+        return aut.false, list(), list()
+    return gr1.solve_streett_game(aut)
+
+
+def _cache_entry(g):
+    """Return cached `list` for `g`, building the automaton if needed.
+
+    At most `_MAX_CACHED` entries are kept,
+    by evicting the least recently used one.
+
+    @type g: `tulip.spec.form.GRSpec`
+    @return: `[aut, z]`
+    """
     if omega is None:
         raise ImportError(
             'Failed to import package `omega`.')
+    sig = _spec_signature(g)
+    entry = _automata.pop(sig, None)
+    if entry is None:
+        entry = [_build_automaton(g), None]
+        while len(_automata) >= _MAX_CACHED:
+            _automata.popitem(last=False)
+    _automata[sig] = entry
+    return entry
+
+
+def _spec_signature(g):
+    """Return hashable summary of what `_build_automaton` reads.
+
+    @type g: `tulip.spec.form.GRSpec`
+    @rtype: `tuple`
+    """
+    def freeze(d):
+        return tuple(sorted(
+            (k, tuple(v) if isinstance(v, list) else v)
+            for k, v in d.items()))
+    return (
+        freeze(g.env_vars), freeze(g.sys_vars),
+        tuple(g.env_init), tuple(g.sys_init),
+        tuple(g.env_safety), tuple(g.sys_safety),
+        tuple(g.env_prog), tuple(g.sys_prog),
+        g.moore, g.plus_one, g.qinit)
+
+
+def _copy_automaton(a):
+    """Return copy of `a` that shares the BDD manager.
+
+    @type a: `omega.symbolic.temporal.Automaton`
+    @rtype: `omega.symbolic.temporal.Automaton`
+    """
+    b = copy.copy(a)
+    b._bdd_to_expr = dict(a._bdd_to_expr)
+    b.moore = a.moore
+    b.plus_one = a.plus_one
+    b.qinit = a.qinit
+    return b
+
+
+def _build_automaton(g):
+    """Return `omega.symbolic.temporal.Automaton` from `GRSpec`.
+
+    @type g: `tulip.spec.form.GRSpec`
+    @rtype: `omega.symbolic.temporal.Automaton`
+    """
     a = trl.Automaton()
-    d = dict(g.env_vars)
-    d.update(g.sys_vars)
-    for k, v in d.items():
-        if v in ('boolean', 'bool'):
-            r = 'bool'
-        elif isinstance(v, list):
-            # string var -> integer var
-            r = (0, len(v) - 1)
-        elif isinstance(v, tuple):
-            r = v
-        else:
-            raise ValueError(
-                'unknown variable type: {v}'.format(v=v))
-        d[k] = r
-    g.str_to_int()
+    _declare_vars(a, g)
+    _load_formulas(a, g)
+    return a
+
+
+def _declare_vars(aut, g):
+    """Declare in `aut` the variables of `g`.
 
+    @type aut: `omega.symbolic.temporal.Automaton`
+    @type g: `tulip.spec.form.GRSpec`
+    """
     # reverse mapping by `synth.strategy2mealy`
-    a.declare_variables(**d)
-    a.varlist.update(env=list(g.env_vars.keys()), sys=list(g.sys_vars.keys()))
+    aut.declare_variables(**_var_types(g))
+
+
+def _var_types(g):
+    """Return `dict` that maps variables of `g` to `omega` types.
+
+    @type g: `tulip.spec.form.GRSpec`
+    @rtype: `dict`
+    """
+    d = dict()
+    for vrs in (g.env_vars, g.sys_vars):
+        for k, v in vrs.items():
+            if v in ('boolean', 'bool'):
+                r = 'bool'
+            elif isinstance(v, list):
+                # string var -> integer var
+                r = (0, len(v) - 1)
+            elif isinstance(v, tuple):
+                r = v
+            else:
+                raise ValueError(
+                    'unknown variable type: {v}'.format(v=v))
+            d[k] = r
+    return d
+
+
+def _load_formulas(a, g):
+    """Set `varlist`, `init`, `action`, `win` of `a` from `g`.
 
+    The variables of `g` should be declared in `a`,
+    see `_declare_vars`.
+
+    @type a: `omega.symbolic.temporal.Automaton`
+    @type g: `tulip.spec.form.GRSpec`
+    """
+    g.str_to_int()
+    # `list`, not `tuple`: `omega.games.gr1` concatenates varlists
+    a.varlist.update(env=list(g.env_vars), sys=list(g.sys_vars))
+
+    TRUE = a.bdd.true
+    FALSE = a.bdd.false
     f = g._bool_int.__getitem__
-    a.init['env'] = " & ".join("( %s )" % f(ei) for ei in g.env_init) if len(g.env_init) > 0 else "TRUE"
-    a.init['sys'] = " & ".join("( %s )" % f(si) for si in g.sys_init) if len(g.sys_init) > 0 else "TRUE"
-    a.action['env'] = " & ".join("( %s )" % f(es) for es in g.env_safety) if len(g.env_safety) > 0 else "TRUE"
-    a.action['sys'] = " & ".join("( %s )" % f(ss) for ss in g.sys_safety) if len(g.sys_safety) > 0 else "TRUE"
+    # formulas that appear in several parts are added once
+    bdds = dict()
+
+    def to_bdd(x):
+        e = f(x)
+        u = bdds.get(e)
+        if u is None:
+            u = a.add_expr(e)
+            bdds[e] = u
+        return u
+
+    def conj(xs):
+        if not xs:
+            return TRUE
+        return _balanced_and(a.bdd, [to_bdd(x) for x in xs])
 
-    w1 = ['!({s})'.format(s=s) for s in map(f, g.env_prog)] if len(g.env_prog) > 0 else ["FALSE"]
-    w2 = [f(sp) for sp in g.sys_prog] if len(g.sys_prog) > 0 else ["TRUE"]
-    a.win['<>[]'] = a.bdds_from(*w1)
-    a.win['[]<>'] = a.bdds_from(*w2)
+    a.init['env'] = conj(g.env_init)
+    a.init['sys'] = conj(g.sys_init)
+    a.action['env'] = conj(g.env_safety)
+    a.action['sys'] = conj(g.sys_safety)
+
+    # negate BDDs, instead of parsing negated formulas
+    w1 = [~ to_bdd(x) for x in g.env_prog] if len(g.env_prog) > 0 else [FALSE]
+    w2 = [to_bdd(x) for x in g.sys_prog] if len(g.sys_prog) > 0 else [TRUE]
+    a.win['<>[]'] = w1
+    a.win['[]<>'] = w2
 
     a.moore = g.moore
     a.plus_one = g.plus_one
     a.qinit = g.qinit
 
-    return a
+
+def _balanced_and(bdd, nodes):
+    """Return conjunction of `nodes`, as a balanced tree.
+
+    Pairwise conjunction keeps intermediate BDDs smaller
+    than a left-associative chain of `and` operations.
+
+    @param nodes: nonempty `list` of nodes in `bdd`
+    """
+    assert nodes, nodes
+    while len(nodes) > 1:
+        pairs = zip(nodes[::2], nodes[1::2])
+        odd = [nodes[-1]] if len(nodes) % 2 else []
+        nodes = [bdd.apply('and', u, v) for u, v in pairs] + odd
+    return nodes[0]
@@ -758,17 +758,21 @@ class GRSpec(LTL):
         finite vars replaced by int-valued vars.
         """
         logger.info('convert string variables to integers...')
-        vars_dict = dict(self.env_vars)
-        vars_dict.update(self.sys_vars)
-        fvars = {v: d for v, d in vars_dict.items() if isinstance(d, list)}
+        # computed only if some clause is not converted yet
+        fvars = None
         # replace symbols by ints
         for p in self._parts:
             for x in getattr(self, p):
                 if self._bool_int.get(x) in self._ast:
-                    logger.debug(str(x) + ' is in _bool_int cache')
+                    logger.debug('%s is in _bool_int cache', x)
                     continue
                 else:
-                    logger.debug(str(x) + ' is not in _bool_int cache')
+                    logger.debug('%s is not in _bool_int cache', x)
+                if fvars is None:
+                    vars_dict = dict(self.env_vars)
+                    vars_dict.update(self.sys_vars)
+                    fvars = {v: d for v, d in vars_dict.items()
+                             if isinstance(d, list)}
                 # get AST
                 a = self.ast(x)
                 # create AST copy with int and bool vars only
@@ -1289,7 +1289,7 @@ def strategy2mealy(A, spec):
             d = _int2str(d, str_vars)
             mach.transitions.add(u, v, attr_dict=None, check=False, **d)
 
-            logger.info('node: {v}, state: {d}'.format(v=v, d=d))
+            logger.info('node: %s, state: %s', v, d)
     # special initial state, for first reaction
     initial_state = 'Sinit'
     mach.states.add(initial_state)
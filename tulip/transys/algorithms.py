@@ -69,7 +69,7 @@ def ltl2ba(formula):
     ba.add_edges_from(g.edges(data=True))
     ba.initial_nodes = initial
     ba.accepting_sets = accepting
-    logger.info('Resulting automaton:\n\n{ba}\n'.format(ba=ba))
+    logger.info('Resulting automaton:\n\n%s\n', ba)
     return ba
 
 
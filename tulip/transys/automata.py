@@ -36,7 +36,7 @@ import copy
 from collections import Iterable
 from pprint import pformat
 from tulip.transys.labeled_graphs import (
-    LabeledDiGraph, str2singleton, prepend_with)
+    LabeledDiGraph, prepend_with)
 from tulip.transys.mathset import SubSet, PowerSet
 from tulip.transys.transys import GameGraph
 
@@ -127,26 +127,27 @@ class FiniteStateAutomaton(LabeledDiGraph):
         return self._accepting
 
     def __str__(self):
-        s = (
-            _hl + '\n' + self.automaton_type + ': ' +
-            self.name + '\n' + _hl + '\n' +
-            'States:\n' +
-            pformat(self.states(data=False), indent=3) + 2 * '\n' +
-            'Initial States:\n' +
-            pformat(self.states.initial, indent=3) + 2 * '\n' +
-            'Accepting States:\n' +
-            pformat(self.states.accepting, indent=3) + 2 * '\n')
+        parts = [
+            _hl, '\n', self.automaton_type, ': ', self.name, '\n',
+            _hl, '\n',
+            'States:\n',
+            pformat(self.states(data=False), indent=3), 2 * '\n',
+            'Initial States:\n',
+            pformat(self.states.initial, indent=3), 2 * '\n',
+            'Accepting States:\n',
+            pformat(self.states.accepting, indent=3), 2 * '\n']
         if self.atomic_proposition_based:
-            s += 'Input Alphabet Letters (\in 2^AP):\n\t'
+            parts.append('Input Alphabet Letters (\in 2^AP):\n\t')
         else:
             if hasattr(self, 'alphabet'):
-                s += ('Input Alphabet Letters:\n\t' +
-                      str(self.alphabet) + 2 * '\n')
-        s += (
-            'Transitions & labeling w/ Input Letters:\n' +
-            pformat(self.transitions(data=True), indent=3) +
-            '\n' + _hl + '\n')
-        return s
+                parts.extend([
+                    'Input Alphabet Letters:\n\t',
+                    str(self.alphabet), 2 * '\n'])
+        parts.extend([
+            'Transitions & labeling w/ Input Letters:\n',
+            pformat(self.transitions(data=True), indent=3),
+            '\n', _hl, '\n'])
+        return ''.join(parts)
 
     def remove_node(self, node):
         """Remove state (also referred to as "node").
@@ -226,6 +227,8 @@ def tuple2ba(S, S0, Sa, Sigma_or_AP, trans, name='ba', prepend_str=None,
     @param trans: transition relation, represented by list of triples::
             [(from_state, to_state, guard), ...]
     where guard \\in \\Sigma.
+    If C{atomic_proposition_based}, then guards are
+    stored as C{frozenset}.
 
     @param name: used for file export
     @type name: str
@@ -244,14 +247,22 @@ def tuple2ba(S, S0, Sa, Sigma_or_AP, trans, name='ba', prepend_str=None,
     initial_states = S0
     accepting_states = Sa
     alphabet_or_ap = Sigma_or_AP
-    transitions = trans
+    transitions = list(trans)
     # prepending states with given str
     if prepend_str:
         logger.debug('Given string:\n\t' + str(prepend_str) + '\n' +
                      'will be prepended to all states.')
-    states = prepend_with(states, prepend_str)
-    initial_states = prepend_with(initial_states, prepend_str)
-    accepting_states = prepend_with(accepting_states, prepend_str)
+    # prepend once to each state, wherever it appears
+    names = set(states)
+    names.update(initial_states, accepting_states)
+    for (from_state, to_state, guard) in transitions:
+        names.add(from_state)
+        names.add(to_state)
+    names = list(names)
+    name_map = dict(zip(names, prepend_with(names, prepend_str)))
+    states = [name_map[s] for s in states]
+    initial_states = [name_map[s] for s in initial_states]
+    accepting_states = [name_map[s] for s in accepting_states]
 
     ba = BuchiAutomaton(atomic_proposition_based=atomic_proposition_based)
     ba.name = name
@@ -264,15 +275,23 @@ def tuple2ba(S, S0, Sa, Sigma_or_AP, trans, name='ba', prepend_str=None,
         ba.alphabet.math_set |= alphabet_or_ap
     else:
         ba.alphabet.add(alphabet_or_ap)
+    # guards converted by convention, memoized
+    # because transitions often share guards
+    letters = dict()
     for transition in transitions:
         (from_state, to_state, guard) = transition
-        [from_state, to_state] = prepend_with([from_state, to_state],
-                                              prepend_str)
-        # convention
+        from_state = name_map[from_state]
+        to_state = name_map[to_state]
+        # convention, stored as `frozenset` (hashable)
         if atomic_proposition_based:
-            if guard is None:
-                guard = set()
-            guard = str2singleton(guard)
+            if guard is None or isinstance(guard, str):
+                if guard not in letters:
+                    letters[guard] = (
+                        frozenset() if guard is None
+                        else frozenset({guard}))
+                guard = letters[guard]
+            else:
+                guard = frozenset(guard)
         ba.transitions.add(from_state, to_state, letter=guard)
     return ba
 
@@ -320,17 +339,19 @@ class RabinPairs(object):
       - U{ltl2dstar<http://ltl2dstar.de/>} documentation
     """
 
+    __slots__ = ('_states', '_pairs')
+
     def __init__(self, automaton_states):
         self._states = automaton_states
         self._pairs = []
 
     def __str__(self):
-        s = 'L = Good states, U = Bad states\n' + 30 * '-' + '\n'
-        for index, (good, bad) in enumerate(self._pairs):
-            s += (
-                'Pair: ' + str(index) + ', L = ' + str(good) +
-                ', U = ' + str(bad) + '\n')
-        return s
+        lines = ['L = Good states, U = Bad states', 30 * '-']
+        lines.extend(
+            'Pair: {i}, L = {good}, U = {bad}'.format(
+                i=index, good=good, bad=bad)
+            for index, (good, bad) in enumerate(self._pairs))
+        return '\n'.join(lines) + '\n'
 
     def __getitem__(self, index):
         return self._pairs[index]
@@ -339,8 +360,8 @@ class RabinPairs(object):
         return iter(self._pairs)
 
     def __call__(self):
-        """Get list of 2-tuples (L, U) of good-bad sets of states."""
-        return list(self._pairs)
+        """Get tuple of 2-tuples (L, U) of good-bad sets of states."""
+        return tuple(self._pairs)
 
     def add(self, good_states, bad_states):
         """Add new acceptance pair (L, U).
@@ -381,17 +402,39 @@ class RabinPairs(object):
 
         See Also
         ========
-        add
+        add, remove_at
 
         @param good_states: set of good states of this pair
         @type good_states: iterable container
         """
+        # pairs obtained via __getitem__ match by identity
+        for index, (good, bad) in enumerate(self._pairs):
+            if good is good_states and bad is bad_states:
+                del self._pairs[index]
+                return
         good_set = SubSet(self._states)
         good_set |= good_states
         bad_set = SubSet(self._states)
         bad_set |= bad_states
         self._pairs.remove((good_set, bad_set))
 
+    def remove_at(self, index):
+        """Delete the pair (L, U) with the given index.
+
+        Note
+        ====
+        Removing a pair which is not last changes
+        the indices of all other pairs.
+
+        See Also
+        ========
+        remove
+
+        @param index: number of Rabin acceptance pair
+        @type index: int <= current total number of pairs
+        """
+        del self._pairs[index]
+
     def add_states(self, pair_index, good_states, bad_states):
         try:
             self._pairs[pair_index][0].add_from(good_states)
@@ -416,6 +459,24 @@ class RabinPairs(object):
         """
         return self._pairs[index][1]
 
+    def accepts(self, states):
+        """Return C{True} if some pair accepts the given states.
+
+        A run is accepted if the set of states that it visits
+        infinitely often intersects L, but not U, for some
+        acceptance pair (L, U).
+
+        @param states: states visited infinitely often by a run
+        @type states: iterable container of valid states
+
+        @rtype: C{bool}
+        """
+        states = list(states)
+        for good, bad in self._pairs:
+            if good.intersects(states) and not bad.intersects(states):
+                return True
+        return False
+
     def has_superset(self, superset):
         """Return true if the given argument is the superset."""
         return superset is self._states
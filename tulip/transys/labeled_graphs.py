@@ -835,12 +835,11 @@ class LabeledDiGraph(nx.MultiDiGraph):
 
     def _check_for_untyped_keys(self, typed_attr, type_defs, check):
         untyped_keys = set(typed_attr).difference(type_defs)
-        msg = (
-            'checking for untyped keys...\n' +
-            'attribute dict: ' + str(typed_attr) + '\n' +
-            'type definitions: ' + str(type_defs) + '\n' +
-            'untyped_keys: ' + str(untyped_keys))
-        logger.debug(msg)
+        logger.debug(
+            'checking for untyped keys...\n'
+            'attribute dict: %s\n'
+            'type definitions: %s\n'
+            'untyped_keys: %s', typed_attr, type_defs, untyped_keys)
         if untyped_keys:
             msg = (
                 'The following edge attributes:\n' +
@@ -996,7 +995,7 @@ class LabeledDiGraph(nx.MultiDiGraph):
                                      self._edge_label_types,
                                      check)
         # the only change from nx in this clause is using TypedDict
-        logger.debug('adding edge: ' + str(u) + ' ---> ' + str(v))
+        logger.debug('adding edge: %s ---> %s', u, v)
         if key is None:
             key = self.new_edge_key(u, v)
         if v in self._succ[u]:
@@ -1262,9 +1261,9 @@ def str2singleton(ap_label):
     can be passed as str '*' instead.
     """
     if isinstance(ap_label, str):
-        logger.debug('Saw str state label:\n\t' + str(ap_label))
+        logger.debug('Saw str state label:\n\t%s', ap_label)
         ap_label = {ap_label}
-        logger.debug('Replaced with singleton:\n\t' + str(ap_label) + '\n')
+        logger.debug('Replaced with singleton:\n\t%s\n', ap_label)
     return ap_label
 
 
@@ -31,14 +31,18 @@
 # SUCH DAMAGE.
 """Products between automata and transition systems"""
 from __future__ import absolute_import
+from collections import defaultdict, deque
 import logging
 import warnings
+import networkx as nx
 from tulip.transys import transys
 from tulip.transys import automata
 
 
 logger = logging.getLogger(__name__)
 _hl = 40 * '-'
+# guard of BA transitions enabled by any TS label
+_TRUE = frozenset({True})
 
 
 class OnTheFlyProductAutomaton(automata.BuchiAutomaton):
@@ -55,10 +59,14 @@ class OnTheFlyProductAutomaton(automata.BuchiAutomaton):
     at the end of each iteration during a search,
     instead of adding each successor to the visited states
     when it is poped from the queue.
+
+    The transitions of C{ba} are indexed by C{__init__},
+    so C{ba} should not be modified afterwards.
     """
     def __init__(self, ba, ts):
         self.ba = ba
         self.ts = ts
+        self._ba_post = _index_ba_transitions(ba)
         super(OnTheFlyProductAutomaton, self).__init__()
         self.atomic_propositions |= ts.atomic_propositions
         self._add_initial()
@@ -82,14 +90,11 @@ class OnTheFlyProductAutomaton(automata.BuchiAutomaton):
             warnings.warn(msg)
 
         for s0 in s0s:
-            logger.debug('initial state:\t' + str(s0))
+            logger.debug('initial state:\t%s', s0)
 
             for q0 in q0s:
-                enabled_ba_trans = find_ba_succ(q0, s0, ts, ba)
-
-                # q0 blocked ?
-                if not enabled_ba_trans:
-                    continue
+                enabled_ba_trans = find_ba_succ(
+                    q0, s0, ts, ba, self._ba_post)
 
                 # which q next ?     (note: curq0 = q0)
                 for (curq0, q, sublabels) in enabled_ba_trans:
@@ -116,13 +121,14 @@ class OnTheFlyProductAutomaton(automata.BuchiAutomaton):
         ba = self.ba
 
         logger.debug('Creating successors from'
-                     ' product state:\t' + str(sq))
+                     ' product state:\t%s', sq)
 
         # get next states
         next_ss = ts.states.post(s)
         next_sqs = set()
         for next_s in next_ss:
-            enabled_ba_trans = find_ba_succ(q, next_s, ts, ba)
+            enabled_ba_trans = find_ba_succ(
+                q, next_s, ts, ba, self._ba_post)
 
             if not enabled_ba_trans:
                 continue
@@ -137,8 +143,8 @@ class OnTheFlyProductAutomaton(automata.BuchiAutomaton):
 
         # new_sqs = {x for x in next_sqs if x not in self}
 
-        logger.debug('next product states: ' + str(next_sqs))
-        logger.debug('new unvisited product states: ' + str(new_sqs))
+        logger.debug('next product states: %s', next_sqs)
+        logger.debug('new unvisited product states: %s', new_sqs)
 
         return new_sqs
 
@@ -201,22 +207,24 @@ def ts_ba_sync_prod(transition_system, buchi_automaton):
     fts = transition_system
     ba = buchi_automaton
 
-    prodts_name = fts.name + '*' + ba.name
     prodts = transys.FiniteTransitionSystem()
-    prodts.name = prodts_name
+    prodts.name = fts.name + '*' + ba.name
 
     prodts.atomic_propositions.add_from(ba.states())
-    prodts.sys_actions.add_from(fts.actions)
+    prodts.env_actions.add_from(fts.env_actions)
+    prodts.sys_actions.add_from(fts.sys_actions)
 
     # construct initial states of product automaton
     s0s = set(fts.states.initial)
     q0s = set(ba.states.initial)
+    ba_post = _index_ba_transitions(ba)
+    ap_of = _state_aps(fts)
+    ap_key = {s: _guard_key(ap) for s, ap in ap_of.items()}
+    ts_post = _index_ts_transitions(fts)
 
     accepting_states_preimage = set()
 
-    logger.debug('\n' + _hl + '\n' +
-                 ' Product TS construction:' +
-                 '\n' + _hl + '\n')
+    logger.debug('\n%s\n Product TS construction:\n%s\n', _hl, _hl)
 
     if not s0s:
         msg = (
@@ -225,107 +233,222 @@ def ts_ba_sync_prod(transition_system, buchi_automaton):
             'Did you forget to define initial states ?')
         warnings.warn(msg)
 
+    # product states in the order visited, and product edges,
+    # to be added in bulk after the search.
+    # The initial states seed the search.
+    initial = list()
+    states = list()
+    visited = set()
+    queue = deque()
+    edges = list()
+    accepting = frozenset(ba.states.accepting)
     for s0 in s0s:
-        logger.debug('initial state:\t' + str(s0))
+        logger.debug('initial state:\t%s', s0)
 
         for q0 in q0s:
-            enabled_ba_trans = find_ba_succ(q0, s0, fts, ba)
-
-            # q0 blocked ?
-            if not enabled_ba_trans:
-                continue
+            enabled_ba_trans = find_ba_succ(
+                q0, s0, fts, ba, ba_post, ap_of)
 
             # which q next ?     (note: curq0 = q0)
             for (curq0, q, sublabels) in enabled_ba_trans:
                 new_sq0 = (s0, q)
-                prodts.states.add(new_sq0)
-                prodts.states.initial.add(new_sq0)
-                prodts.states[new_sq0]['ap'] = {q}
+                if new_sq0 in visited:
+                    continue
+                visited.add(new_sq0)
+                initial.append(new_sq0)
+                states.append(new_sq0)
+                queue.append(new_sq0)
 
                 # accepting state ?
-                if q in ba.states.accepting:
+                if q in accepting:
                     accepting_states_preimage.add(new_sq0)
 
     # start visiting reachable in DFS or BFS way
     # (doesn't matter if we are going to store the result)
-    queue = set(prodts.states.initial)
-    visited = set()
     while queue:
-        sq = queue.pop()
-        visited.add(sq)
+        sq = queue.popleft()
         (s, q) = sq
 
-        logger.debug('Current product state:\t' + str(sq))
+        logger.debug('Current product state:\t%s', sq)
 
         # get next states
-        next_ss = fts.states.post(s)
-        next_sqs = set()
-        for next_s in next_ss:
-            enabled_ba_trans = find_ba_succ(q, next_s, fts, ba)
+        guards = ba_post.get(q, dict())
+        for next_s, ts_labels in ts_post.get(s, dict()).items():
+            try:
+                key = ap_key[next_s]
+            except KeyError:
+                raise _no_ap_label(next_s)
+            # several enabled BA transitions can lead to the same `next_q`
+            next_qs = set()
+            for _, next_q, _ in _enabled_ba_trans(guards, key):
+                if next_q in next_qs:
+                    continue
+                next_qs.add(next_q)
+                new_sq = (next_s, next_q)
+                if new_sq not in visited:
+                    logger.debug('Adding state:\t%s', new_sq)
+                    visited.add(new_sq)
+                    states.append(new_sq)
+                    queue.append(new_sq)
 
-            if not enabled_ba_trans:
-                continue
+                    # accepting state ?
+                    if next_q in accepting:
+                        accepting_states_preimage.add(new_sq)
+
+                logger.debug('Adding transitions:\t%s--->%s', sq, new_sq)
+                # is fts transition labeled with an action ?
+                for sublabel_values in ts_labels:
+                    edges.append((sq, new_sq, sublabel_values))
+
+    # states and edges come from a search over the validated
+    # TS and BA, so add them directly to the graph
+    # one immutable label per BA state, shared by its product states
+    labels = {q: frozenset({q}) for q in ba.states}
+    nx.MultiDiGraph.add_nodes_from(
+        prodts, ((sq, {'ap': labels[sq[1]]}) for sq in states))
+    for u, v, d in edges:
+        nx.MultiDiGraph.add_edge(prodts, u, v, **d)
+    prodts.states.initial.add_from(initial)
+    return (prodts, accepting_states_preimage)
 
-            (new_sqs, new_accepting) = find_prod_succ(
-                sq, next_s, enabled_ba_trans,
-                prodts, ba, fts)
 
-            next_sqs.update(new_sqs)
-            accepting_states_preimage.update(new_accepting)
+def _index_ba_transitions(ba, states=None):
+    """Return the transitions of C{ba} indexed by state and guard.
+
+    @param states: index only transitions from these states,
+        or all transitions, if C{None}
+    @return: C{dict} that maps each state C{q} to a C{dict}
+        that maps guards to the list of transitions
+        C{(q, next_q, label)} from C{q} that are labeled with
+        that guard. Set guards are keyed as C{frozenset},
+        unlabeled transitions are keyed as C{None}.
+    @rtype: C{defaultdict}
+    """
+    ba_post = defaultdict(lambda: defaultdict(list))
+    for q, next_q, label in ba.transitions.find(states):
+        if label:
+            guard = _guard_key(label['letter'])
+        else:
+            guard = None
+        ba_post[q][guard].append((q, next_q, label))
+    return ba_post
+
+
+def _index_ts_transitions(ts):
+    """Return the labels of transitions of C{ts} indexed by endpoints.
+
+    @return: C{dict} that maps each state C{s} to a C{dict}
+        that maps each successor C{t} of C{s} to the list of
+        label dicts of the edges from C{s} to C{t}.
+    @rtype: C{defaultdict}
+    """
+    ts_post = defaultdict(lambda: defaultdict(list))
+    for s, t, label in ts.transitions(data=True):
+        ts_post[s][t].append(label)
+    return ts_post
 
-        logger.debug('next product states: ' + str(next_sqs))
-        # discard visited & push them to queue
-        new_sqs = {x for x in next_sqs if x not in visited}
-        logger.debug('new unvisited product states: ' + str(new_sqs))
-        queue.update(new_sqs)
 
-    return (prodts, accepting_states_preimage)
+def _guard_key(guard):
+    """Return hashable C{guard}, for indexing BA transitions."""
+    if isinstance(guard, (set, frozenset)):
+        return frozenset(guard)
+    return guard
+
+
+def _state_aps(fts):
+    """Return C{dict} that maps states of C{fts} to their AP labels.
+
+    States without an C{'ap'} label are omitted.
+    """
+    return {s: d['ap'] for s, d in fts.states(data=True) if 'ap' in d}
+
 
+def find_ba_succ(prev_q, next_s, fts, ba, ba_post=None, ap_of=None):
+    """Return BA transitions from C{prev_q} enabled by C{next_s}.
 
-def find_ba_succ(prev_q, next_s, fts, ba):
+    A transition is enabled if its guard equals the label
+    of C{next_s}, or is C{{True}}, or it is unlabeled.
+
+    @param ba_post: transitions of C{ba},
+        as returned by C{_index_ba_transitions}.
+        If C{None}, then the transitions from C{prev_q}
+        are read from C{ba}.
+    @param ap_of: AP labels of states of C{fts},
+        as returned by C{_state_aps}.
+        If C{None}, then read from C{fts}.
+    """
     q = prev_q
+    if ba_post is None:
+        ba_post = _index_ba_transitions(ba, [q])
 
-    logger.debug('Next state:\t' + str(next_s))
+    logger.debug('Next state:\t%s', next_s)
     try:
-        ap = fts.nodes[next_s]['ap']
+        if ap_of is None:
+            ap = fts.nodes[next_s]['ap']
+        else:
+            ap = ap_of[next_s]
     except:
-        raise Exception(
-            'No AP label for FTS state: ' + str(next_s) +
-            '\n Did you forget labeing it ?')
+        raise _no_ap_label(next_s)
 
-    Sigma_dict = {'letter': ap}
-    logger.debug("Next state's label:\t" + str(ap))
+    logger.debug("Next state's label:\t%s", ap)
 
-    enabled_ba_trans = ba.transitions.find(
-        [q], with_attr_dict=Sigma_dict)
-    enabled_ba_trans += ba.transitions.find(
-        [q], letter={True})
-    logger.debug('Enabled BA transitions:\n\t' +
-                 str(enabled_ba_trans))
+    guards = ba_post.get(q, dict())
+    enabled_ba_trans = _enabled_ba_trans(guards, _guard_key(ap))
+    logger.debug('Enabled BA transitions:\n\t%s', enabled_ba_trans)
 
     if not enabled_ba_trans:
-        logger.debug('No enabled BA transitions at: ' + str(q))
+        logger.debug('No enabled BA transitions at: %s', q)
 
     logger.debug('---\n')
 
     return enabled_ba_trans
 
 
+def _enabled_ba_trans(guards, key):
+    """Return BA transitions enabled by the label C{key}.
+
+    A transition is enabled if its guard equals C{key},
+    or is C{{True}}, or it is unlabeled.
+
+    @param guards: transitions from a BA state,
+        indexed as by C{_index_ba_transitions}
+    @param key: label of TS state, as returned by C{_guard_key}
+    @rtype: C{list}
+    """
+    enabled_ba_trans = list(guards.get(key, ()))
+    if key != _TRUE:
+        enabled_ba_trans.extend(guards.get(_TRUE, ()))
+    enabled_ba_trans.extend(guards.get(None, ()))
+    return enabled_ba_trans
+
+
+def _no_ap_label(s):
+    """Return C{Exception} for FTS state C{s} that has no AP label."""
+    return Exception(
+        'No AP label for FTS state: ' + str(s) +
+        '\n Did you forget labeling it ?')
+
+
 def find_prod_succ(prev_sq, next_s, enabled_ba_trans, product, ba, fts):
     (s, q) = prev_sq
 
+    # is fts transition labeled with an action ?
+    enabled_ts_trans = fts.transitions.find(
+        [s], to_states=[next_s],
+        with_attr_dict=None)
+
     new_accepting = set()
-    next_sqs = set()
+    next_sqs = list()
     for (curq, next_q, sublabels) in enabled_ba_trans:
         assert(curq == q)
 
         new_sq = (next_s, next_q)
 
         if new_sq not in product:
-            next_sqs.add(new_sq)
+            next_sqs.append(new_sq)
             product.states.add(new_sq)
 
-            logger.debug('Adding state:\t' + str(new_sq))
+            logger.debug('Adding state:\t%s', new_sq)
 
         if hasattr(product, 'actions'):
             product.states[new_sq]['ap'] = {next_q}
@@ -333,22 +456,15 @@ def find_prod_succ(prev_sq, next_s, enabled_ba_trans, product, ba, fts):
         # accepting state ?
         if next_q in ba.states.accepting:
             new_accepting.add(new_sq)
-            logger.debug(str(new_sq) +
-                         ' contains an accepting state.')
+            logger.debug('%s contains an accepting state.', new_sq)
 
-        logger.debug('Adding transitions:\t' +
-                     str(prev_sq) + '--->' + str(new_sq))
+        logger.debug('Adding transitions:\t%s--->%s', prev_sq, new_sq)
 
-        # is fts transition labeled with an action ?
-        enabled_ts_trans = fts.transitions.find(
-            [s], to_states=[next_s],
-            with_attr_dict=None)
         for (from_s, to_s, sublabel_values) in enabled_ts_trans:
             assert(from_s == s)
             assert(to_s == next_s)
 
-            logger.debug('Sublabel value:\n\t' +
-                         str(sublabel_values))
+            logger.debug('Sublabel value:\n\t%s', sublabel_values)
 
             # labeled transition ?
             if hasattr(product, 'alphabet'):
@@ -378,6 +494,12 @@ def ba_ts_sync_prod(buchi_automaton, transition_system):
                  'Product: BA * TS' +
                  '\n' + _hl + '\n')
 
+    if not buchi_automaton.atomic_proposition_based:
+        msg = (
+            'Buchi Automaton must be Atomic Proposition-based,'
+            ' otherwise the synchronous product is not well-defined.')
+        raise Exception(msg)
+
     (prod_ts, persistent) = ts_ba_sync_prod(
         transition_system, buchi_automaton)
 
@@ -393,30 +515,28 @@ def ba_ts_sync_prod(buchi_automaton, transition_system):
     # accepting states = persistent set
     prod_ba.states.accepting |= persistent
 
-    # copy edges, translating transitions,
-    # i.e., changing transition labels
-    if not buchi_automaton.atomic_proposition_based:
-        msg = (
-            'Buchi Automaton must be Atomic Proposition-based,'
-            ' otherwise the synchronous product is not well-defined.')
-        raise Exception(msg)
-
     # direct access, not the inefficient
     #   prod_ba.alphabet.add_from(buchi_automaton.alphabet() ),
     # which would generate a combinatorially large alphabet
     prod_ba.alphabet.math_set |= buchi_automaton.alphabet.math_set
 
+    # copy edges, translating transitions,
+    # i.e., changing transition labels
+    ts_ap = _state_aps(transition_system)
+    add_transition = prod_ba.transitions.add
+    # parallel edges of `prod_ts` differ only in TS actions,
+    # so they map to the same labeled edge
+    seen = set()
     for (from_state, to_state) in prod_ts.transitions():
+        if (from_state, to_state) in seen:
+            continue
+        seen.add((from_state, to_state))
         # prject prod_TS state to TS state
         ts_to_state = to_state[0]
-        msg = (
-            'prod_TS: to_state =\n\t' + str(to_state) + '\n'
-            'TS: ts_to_state =\n\t' + str(ts_to_state))
-        logger.debug(msg)
-
-        state_label_pairs = transition_system.states.find(ts_to_state)
-        (ts_to_state_, transition_label_dict) = state_label_pairs[0]
-        transition_label_value = transition_label_dict['ap']
-        prod_ba.transitions.add(
-            from_state, to_state, letter=transition_label_value)
+        logger.debug(
+            'prod_TS: to_state =\n\t%s\n'
+            'TS: ts_to_state =\n\t%s', to_state, ts_to_state)
+
+        transition_label_value = ts_ap[ts_to_state]
+        add_transition(from_state, to_state, letter=transition_label_value)
     return prod_ba